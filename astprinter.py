@@ -1,45 +1,178 @@
 from typing import Any, List
 
 from expression import Binary, Expr, Grouping, Literal, Unary
+from flatast import FlatExpr, KIND_BINARY, KIND_LITERAL, KIND_UNARY
 from loxtoken import Token, TokenType
 from visitor import Visitor
 
+# how the generated printer prints each node, i.e. node class -> (python
+# expression for the name, child fields), or None for a literal (a leaf);
+# mirrors the visit_* handlers, and print_flat. NB: ordered by expected frequency, since it's an if-chain
+_PRINT_SPECS = {
+    Binary: ('expr.operator.lexeme', ('left', 'right')),
+    Literal: None,
+    Unary: ('expr.operator.lexeme', ('right',)),
+    Grouping: ("'group'", ('expression',)),
+}
+
 
 class AstPrinter(Visitor):
     """
     Visitor for printing AST
+
+    NB: rather than each handler returning a string, which the parent
+    then joins, handlers append chunks to a shared buffer, which is
+    joined once, in `print`
     """
-    def visit_binary(self, expr: Binary) -> str:
-        return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
+    def __init__(self):
+        self.buf: List[str] = []
 
-    def visit_grouping(self, expr: Grouping) -> str:
-        return self.parenthesize("group", expr.expression)
+    def visit_binary(self, expr: Binary):
+        self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
 
-    def visit_literal(self, expr: Literal) -> str:
+    def visit_grouping(self, expr: Grouping):
+        self.parenthesize("group", expr.expression)
+
+    def visit_literal(self, expr: Literal):
         if expr.value is None:
-            return "nil"
-        return str(expr.value)
+            self.buf.append("nil")
+        else:
+            self.buf.append(str(expr.value))
 
-    def visit_unary(self, expr: Unary) -> str:
-        return self.parenthesize(expr.operator.lexeme, expr.right)
+    def visit_unary(self, expr: Unary):
+        self.parenthesize(expr.operator.lexeme, expr.right)
 
-    def parenthesize(self, name, *args: List[Expr]) -> str:
+    def parenthesize(self, name, *args: List[Expr]):
         """
+        append `(name arg0 arg1 ...)` to buf
         """
+        buf = self.buf
         if len(args) == 0:
-            return name
+            buf.append(name)
+            return
 
-        # array of string representations
-        str_arr = []
+        buf.append('(')
+        buf.append(name)
         for subexpr in args:
-            subexpr_str = subexpr.accept(self)
-            str_arr.append(subexpr_str)
-
-        body = ' '.join(str_arr)
-        return f'({name} {body})'
+            buf.append(' ')
+            self.visit(subexpr)
+        buf.append(')')
 
     def print(self, expr: Expr) -> str:
-        return expr.accept(self)
+        cls = type(self)
+        # NB: generated once per class, on first use
+        print_impl = cls.__dict__.get('_print_impl')
+        if print_impl is None:
+            print_impl = cls._print_impl = cls._generate_print()
+        self.buf = []
+        try:
+            print_impl(self, expr, self.buf.append)
+        except RecursionError:
+            # NB: the tree is too deep to print recursively, e.g. a long chain of
+            # (left-associative) binary ops; print its flat form with a loop instead,
+            # unless a handler is overridden, since print_flat wouldn't use it
+            if not print_impl.handles_all:
+                raise
+            return self.print_flat(FlatExpr.from_expr(expr))
+        return ''.join(self.buf)
+
+    @classmethod
+    def _generate_print(cls):
+        """
+        generate a printer specialized to the node types, i.e.
+
+            def print_impl(self, expr, append):
+                expr_type = type(expr)
+                if expr_type is Binary:
+                    append('(')
+                    append(expr.operator.lexeme)
+                    append(' ')
+                    print_impl(self, expr.left, append)
+                    ...
+                elif expr_type is Literal:
+                    ...
+                else:
+                    self.visit(expr)
+
+        so each node costs one frame, with no dispatch or parenthesize call.
+        Node types whose handler is overridden by `cls`, or not known
+        here, fall through to visit; as do parenthesized nodes, if
+        `cls` overrides parenthesize, since that's inlined here
+        """
+        namespace = {}
+        lines = ['def print_impl(self, expr, append):',
+                 '    expr_type = type(expr)']
+        inline_parenthesize = cls.parenthesize is AstPrinter.parenthesize
+        for node_class, spec in _PRINT_SPECS.items():
+            handler_name = node_class._visit_name
+            if getattr(cls, handler_name) is not getattr(AstPrinter, handler_name):
+                continue
+            if spec is not None and not inline_parenthesize:
+                continue
+            namespace[node_class.__name__] = node_class
+            branch = 'elif' if len(lines) > 2 else 'if'
+            lines.append(f'    {branch} expr_type is {node_class.__name__}:')
+            if spec is None:
+                lines.append('        value = expr.value')
+                lines.append("        append('nil' if value is None else str(value))")
+                continue
+            name, fields = spec
+            lines.append("        append('(')")
+            lines.append(f'        append({name})')
+            for field in fields:
+                lines.append("        append(' ')")
+                lines.append(f'        print_impl(self, expr.{field}, append)')
+            lines.append("        append(')')")
+        if len(lines) > 2:
+            lines.append('    else:')
+            lines.append('        self.visit(expr)')
+        else:
+            lines.append('    self.visit(expr)')
+
+        # whether every node type is specialized, i.e. printed as print_flat does
+        handles_all = len(namespace) == len(_PRINT_SPECS)
+        exec('\n'.join(lines), namespace)
+        print_impl = namespace['print_impl']
+        print_impl.handles_all = handles_all
+        return print_impl
+
+    @staticmethod
+    def print_flat(flat: FlatExpr) -> str:
+        """
+        print a flattened expression; produces the same output as `print`.
+        This is a single loop over the arrays, with an explicit
+        stack of pending items, i.e. either a chunk of output (str)
+        or the index of a node to print
+        """
+        kind, left, right, data = flat.kind, flat.left, flat.right, flat.data
+        buf = []
+        stack = [0]
+        while stack:
+            item = stack.pop()
+            if type(item) is str:
+                buf.append(item)
+                continue
+
+            node_kind = kind[item]
+            if node_kind == KIND_LITERAL:
+                value = data[item]
+                buf.append("nil" if value is None else str(value))
+            elif node_kind == KIND_BINARY:
+                buf.append('(')
+                buf.append(data[item].lexeme)
+                buf.append(' ')
+                # pushed in reverse order of output
+                stack.append(')')
+                stack.append(right[item])
+                stack.append(' ')
+                stack.append(left[item])
+            else:
+                buf.append('(')
+                buf.append(data[item].lexeme if node_kind == KIND_UNARY else "group")
+                buf.append(' ')
+                stack.append(')')
+                stack.append(right[item])
+        return ''.join(buf)
 
 
 if __name__ == '__main__':
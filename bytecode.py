@@ -0,0 +1,77 @@
+"""
+Bytecode definitions, i.e. opcodes and the chunk of
+bytecode that the compiler emits and the vm executes
+"""
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from loxtoken import Token
+
+# NOTE: the tutorial defines opcodes as a C enum; I'm using
+# plain ints, since comparing these is cheaper than comparing enum members
+
+OP_CONSTANT = 0  # operand: 2 byte (big-endian) index into constants
+OP_NIL = 1
+OP_TRUE = 2
+OP_FALSE = 3
+OP_EQUAL = 4
+OP_NOT_EQUAL = 5
+OP_GREATER = 6
+OP_GREATER_EQUAL = 7
+OP_LESS = 8
+OP_LESS_EQUAL = 9
+OP_ADD = 10
+OP_SUBTRACT = 11
+OP_MULTIPLY = 12
+OP_DIVIDE = 13
+OP_NOT = 14
+OP_NEGATE = 15
+OP_PRINT = 16
+OP_POP = 17
+OP_RETURN = 18
+OP_CONSTANT_LONG = 19  # operand: 3 byte (big-endian) index into constants
+
+OP_COUNT = 20
+
+# opcodes that only consume and produce numbers (floats); a chunk
+# that only contains these can run on the compiled fast path (see jit.py)
+NUMERIC_OPS = frozenset({OP_CONSTANT, OP_CONSTANT_LONG, OP_ADD, OP_SUBTRACT, OP_MULTIPLY, OP_DIVIDE, OP_NEGATE,
+                         OP_PRINT, OP_POP, OP_RETURN})
+
+# number of constants addressable by OP_CONSTANT, and OP_CONSTANT_LONG, respectively
+MAX_SHORT_CONSTANTS = 1 << 16
+MAX_CONSTANTS = 1 << 24
+
+
+class Chunk:
+    """
+    A sequence of bytecode, and the constants it references
+    """
+    def __init__(self):
+        self.code = array('B')
+        self.constants: List[Any] = []
+        # maps (type, value) of each constant -> its index, so repeated values
+        # share a slot; NB: keyed by type too, since e.g. 1.0 == True
+        self.constant_indexes: Dict[Tuple[type, Any], int] = {}
+        # the token that each byte was compiled from, if any; used
+        # for reporting runtime errors (the tutorial stores line numbers)
+        self.tokens: List[Optional[Token]] = []
+        # whether all opcodes are in NUMERIC_OPS, and all constants are
+        # floats; this is maintained by the compiler
+        self.numeric = True
+
+    def write(self, byte: int, token: Optional[Token] = None):
+        self.code.append(byte)
+        self.tokens.append(token)
+
+    def add_constant(self, value: Any) -> int:
+        """
+        add `value` to constants, unless it's already there, and return its index
+        """
+        key = (type(value), value)
+        index = self.constant_indexes.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self.constant_indexes[key] = index
+        return index
@@ -0,0 +1,148 @@
+"""
+Compiles the AST into bytecode
+"""
+from typing import List, Optional
+
+from bytecode import (Chunk, MAX_CONSTANTS, MAX_SHORT_CONSTANTS, NUMERIC_OPS, OP_ADD, OP_CONSTANT, OP_CONSTANT_LONG,
+                      OP_DIVIDE, OP_EQUAL, OP_FALSE, OP_GREATER, OP_GREATER_EQUAL, OP_LESS, OP_LESS_EQUAL, OP_MULTIPLY,
+                      OP_NEGATE, OP_NIL, OP_NOT, OP_NOT_EQUAL, OP_POP, OP_PRINT, OP_RETURN, OP_SUBTRACT, OP_TRUE)
+from expression import Binary, Expr, Expression, Grouping, Literal, Print, Stmt, Unary
+from loxtoken import TokenType
+from visitor import Visitor
+
+
+class CompileError(Exception):
+    pass
+
+
+_BINARY_OPCODES = {
+    TokenType.BANG_EQUAL: OP_NOT_EQUAL,
+    TokenType.EQUAL_EQUAL: OP_EQUAL,
+    TokenType.GREATER: OP_GREATER,
+    TokenType.GREATER_EQUAL: OP_GREATER_EQUAL,
+    TokenType.LESS: OP_LESS,
+    TokenType.LESS_EQUAL: OP_LESS_EQUAL,
+    TokenType.MINUS: OP_SUBTRACT,
+    TokenType.PLUS: OP_ADD,
+    TokenType.SLASH: OP_DIVIDE,
+    TokenType.STAR: OP_MULTIPLY,
+}
+
+_UNARY_OPCODES = {
+    TokenType.BANG: OP_NOT,
+    TokenType.MINUS: OP_NEGATE,
+}
+
+
+class Compiler(Visitor):
+    """
+    Visitor for compiling AST into a (flat) chunk of bytecode.
+    Expressions are compiled post-order, i.e. operands are
+    pushed onto the vm's stack before the operator consumes them
+    """
+    def __init__(self, error_reporter: 'ErrorReporter'):
+        self.error_reporter = error_reporter
+        self.chunk = Chunk()
+
+    def compile(self, statements: List[Stmt]) -> Optional[Chunk]:
+        """
+        compile `statements` and return the chunk; or None
+        if there was an error, which is reported
+        """
+        self.chunk = Chunk()
+        try:
+            for statement in statements:
+                self.visit(statement)
+        except CompileError as e:
+            self.error_reporter.compile_error(str(e))
+            return None
+        self.chunk.write(OP_RETURN)
+        return self.chunk
+
+    def emit_constant(self, value):
+        chunk = self.chunk
+        index = chunk.add_constant(value)
+        if index < MAX_SHORT_CONSTANTS:
+            chunk.write(OP_CONSTANT)
+            chunk.write(index >> 8)
+            chunk.write(index & 0xff)
+        elif index < MAX_CONSTANTS:
+            chunk.write(OP_CONSTANT_LONG)
+            chunk.write(index >> 16)
+            chunk.write(index >> 8 & 0xff)
+            chunk.write(index & 0xff)
+        else:
+            raise CompileError("Too many constants in one chunk.")
+
+    def emit_expression(self, expr: Expr):
+        """
+        emit bytecode for `expr`
+
+        NB: like Interpreter.evaluate, operator nodes are walked (post-order)
+        with an explicit stack, rather than by recursing through visit_*,
+        so deeply nested expressions don't exceed python's recursion limit
+        """
+        chunk = self.chunk
+        # pending (node, reduce) pairs; reduce is set once
+        # the node's operands have been emitted
+        stack = [(expr, False)]
+        while stack:
+            node, reduce = stack.pop()
+            node_type = type(node)
+            if node_type is Binary:
+                if reduce:
+                    opcode = _BINARY_OPCODES[node.operator.token_type]
+                    if opcode not in NUMERIC_OPS:
+                        chunk.numeric = False
+                    chunk.write(opcode, node.operator)
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif node_type is Unary:
+                if reduce:
+                    opcode = _UNARY_OPCODES[node.operator.token_type]
+                    if opcode not in NUMERIC_OPS:
+                        chunk.numeric = False
+                    chunk.write(opcode, node.operator)
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+            elif node_type is Literal:
+                self.visit_literal(node)
+            elif node_type is Grouping:
+                stack.append((node.expression, False))
+            else:
+                self.visit(node)
+
+    def visit_expression(self, stmt: Expression):
+        self.emit_expression(stmt.expression)
+        # discard the unused value
+        self.chunk.write(OP_POP)
+
+    def visit_print(self, stmt: Print):
+        self.emit_expression(stmt.expression)
+        self.chunk.write(OP_PRINT)
+
+    def visit_literal(self, expr: Literal):
+        # NB: checking identity, since e.g. 1.0 == True
+        if expr.value is None:
+            self.chunk.write(OP_NIL)
+        elif expr.value is True:
+            self.chunk.write(OP_TRUE)
+        elif expr.value is False:
+            self.chunk.write(OP_FALSE)
+        else:
+            self.emit_constant(expr.value)
+        # NB: the compiled fast path only handles floats
+        if type(expr.value) is not float:
+            self.chunk.numeric = False
+
+    def visit_grouping(self, expr: Grouping):
+        self.emit_expression(expr)
+
+    def visit_unary(self, expr: Unary):
+        self.emit_expression(expr)
+
+    def visit_binary(self, expr: Binary):
+        self.emit_expression(expr)
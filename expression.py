@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from typing import Any
 
 from loxtoken import Token
+from utils import camel_to_snake
 
 # NOTE: the tutorial uses a utility to generate the
 # parser symbol classes; I'm using dataclasses
@@ -16,17 +17,46 @@ from loxtoken import Token
 # NOTE: reconsider the pattern of dataclasses inheriting
 # from Stmt or Expr
 
+# NOTE: nodes are slotted (no per-instance __dict__), since
+# a program can have many of them
 
-@dataclass
-class Stmt:
+
+# maps visitor method name -> node class; populated as (node) classes are
+# defined, and used to generate specialized visit methods (see Visitor)
+NODE_CLASSES = {}
+
+
+class Node:
+    """
+    Common root of Stmt and Expr hierarchies
+
+    NOTE: unlike the tutorial, nodes don't have an `accept` method;
+    visitors dispatch on the node's class directly (see Visitor.visit),
+    which saves a call (frame) per node visited
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # name of the visitor method that handles this class,
+        # computed once here instead of on every visit.
+        # NB: this requires the class and handler have the
+        # same name in PascalCase and snake_case, respectively
+        cls._visit_name = f'visit_{camel_to_snake(cls.__name__)}'
+        # NB: dataclass(slots=True) replaces the class, so this
+        # is overwritten with the final class
+        NODE_CLASSES[cls._visit_name] = cls
+
+
+class Stmt(Node):
     """
     Root of statement hierarchy
     """
-    def accept(self, visitor: 'Visitor') -> Any:
-        return visitor.visit(self)
+    # NB: no fields; empty slots so subclasses don't get a __dict__
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class Print(Stmt):
     """
     A print statement
@@ -34,7 +64,7 @@ class Print(Stmt):
     expression: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Expression(Stmt):
     """
     An expression statement
@@ -42,7 +72,7 @@ class Expression(Stmt):
     expression: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Var(Stmt):
     """
     A variable declaration
@@ -51,24 +81,17 @@ class Var(Stmt):
     initializer: Expr
 
 
-@dataclass
-class Expr:
+class Expr(Node):
     """
     This class should not be directly instantiated; but I don't
     want to make it abstract, since I'll need to implement the visit
     methods for each derived (implemented) class.
-
-    TODO: investigate whether I can mark the class abstract
-    and still rely on the parent method being callable
-    i.e. so each node (implementing) class doesn't have to implement it
     """
     # expression: 'Expr'
-
-    def accept(self, visitor: 'Visitor') -> Any:
-        return visitor.visit(self)
+    __slots__ = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class Binary(Expr):
     """
     binary op
@@ -78,7 +101,7 @@ class Binary(Expr):
     right: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Grouping(Expr):
     """
     a grouping, i.e. via bracketing
@@ -86,7 +109,7 @@ class Grouping(Expr):
     expression: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expr):
     """
     literal
@@ -94,7 +117,7 @@ class Literal(Expr):
     value: Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Unary(Expr):
     """
     unary op
@@ -103,6 +126,6 @@ class Unary(Expr):
     right: Expr
 
 
-@dataclass
+@dataclass(slots=True)
 class Variable(Expr):
     name: Token
@@ -0,0 +1,87 @@
+"""
+Flat (struct of arrays) representation of an expression tree
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Any, List
+
+from expression import Binary, Expr, Grouping, Literal, Unary
+
+# node kinds
+KIND_LITERAL = 0
+KIND_BINARY = 1
+KIND_UNARY = 2
+KIND_GROUPING = 3
+
+_KINDS = {
+    Literal: KIND_LITERAL,
+    Binary: KIND_BINARY,
+    Unary: KIND_UNARY,
+    Grouping: KIND_GROUPING,
+}
+
+
+class FlatExpr:
+    """
+    An expression tree stored as parallel arrays, indexed by node number,
+    rather than as a tree of node objects. For node i:
+        kind[i]: one of KIND_*
+        left[i], right[i]: index of child node, or -1 if none;
+            unary and grouping nodes only have a right child
+        data[i]: value of literal, or operator token (of binary and unary)
+
+    Nodes are numbered in pre-order, so the root is node 0. This is
+    meant for whole-tree passes, which become linear scans over
+    the arrays, rather than chasing pointers between nodes
+    """
+    __slots__ = ('kind', 'left', 'right', 'data')
+
+    def __init__(self):
+        self.kind = array('b')
+        self.left = array('i')
+        self.right = array('i')
+        self.data: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    @classmethod
+    def from_expr(cls, expr: Expr) -> FlatExpr:
+        """
+        flatten the tree rooted at `expr`
+        NB: uses an explicit stack, so deep trees don't exceed the recursion limit
+        """
+        flat = cls()
+        kind, left, right, data = flat.kind, flat.left, flat.right, flat.data
+        # pending (node, index of parent, whether node is parent's left child)
+        stack = [(expr, -1, False)]
+        while stack:
+            node, parent, is_left = stack.pop()
+            index = len(kind)
+            if parent >= 0:
+                if is_left:
+                    left[parent] = index
+                else:
+                    right[parent] = index
+
+            node_kind = _KINDS.get(type(node))
+            if node_kind is None:
+                raise ValueError(f"cannot flatten {type(node).__name__}")
+            kind.append(node_kind)
+            left.append(-1)
+            right.append(-1)
+            if node_kind == KIND_LITERAL:
+                data.append(node.value)
+            elif node_kind == KIND_BINARY:
+                data.append(node.operator)
+                # push right first, so left is numbered first
+                stack.append((node.right, index, False))
+                stack.append((node.left, index, True))
+            elif node_kind == KIND_UNARY:
+                data.append(node.operator)
+                stack.append((node.right, index, False))
+            else:
+                data.append(None)
+                stack.append((node.expression, index, False))
+        return flat
@@ -1,4 +1,4 @@
-from numbers import Number
+import operator
 from typing import Any, List
 
 from loxtoken import TokenType, Token
@@ -6,6 +6,12 @@ from expression import Binary, Expr, Expression, Grouping, Literal, Print, Stmt,
 from visitor import Visitor, HandlerNotFoundException
 
 
+# numeric types of lox values; NB: testing type(x) against a set of concrete
+# types is much cheaper than isinstance against the numbers.Number ABC.
+# bool is included, since isinstance(True, Number) held too
+_NUMERIC_TYPES = frozenset({int, float, bool})
+
+
 class InterpretationError(Exception):
     pass
 
@@ -36,31 +42,57 @@ class Interpreter(Visitor):
     def evaluate(self, expr: Expr):
         """
         evaluate expression
+
+        NB: operator nodes are walked (post-order) with an explicit stack,
+        rather than by recursing through visit_*, so that deeply nested
+        expressions don't exceed python's recursion limit; any other
+        node is dispatched to its handler
         """
-        return expr.accept(self)
+        values = []
+        # pending (node, reduce) pairs; reduce is set once
+        # the node's operands have been pushed to `values`
+        stack = [(expr, False)]
+        while stack:
+            node, reduce = stack.pop()
+            node_type = type(node)
+            if node_type is Binary:
+                if reduce:
+                    right = values.pop()
+                    values[-1] = BIN_OPS[node.operator.token_type](values[-1], right)
+                else:
+                    # push right first, so left is evaluated first
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+            elif node_type is Unary:
+                if reduce:
+                    values[-1] = UN_OPS[node.operator.token_type](node.operator, values[-1])
+                else:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+            elif node_type is Grouping:
+                stack.append((node.expression, False))
+            elif node_type is Literal:
+                values.append(node.value)
+            else:
+                values.append(self.visit(node))
+        return values[0]
 
     def execute(self, stmt: Stmt):
         """
         Execute stmt
         """
-        return stmt.accept(self)
+        return self.visit(stmt)
 
     def visit_literal(self, expr: Literal) -> Any:
         return expr.value
 
     def visit_grouping(self, expr: Grouping) -> Any:
-        self.evaluate(expr.expression)
+        return self.evaluate(expr.expression)
 
     def visit_unary(self, expr: Unary) -> Any:
         right = self.evaluate(expr.right)
-
-        if expr.operator == TokenType.BANG:
-            return self.is_truthy(right)
-        elif expr.operator == TokenType.MINUS:
-            self.check_number_operand(expr.operator, right)
-            return -1 * float(right)
-
-        return None
+        return UN_OPS[expr.operator.token_type](expr.operator, right)
 
     def visit_binary(self, expr: Binary) -> Any:
         """
@@ -70,36 +102,7 @@ class Interpreter(Visitor):
 
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
-        if expr.operator.token_type == TokenType.MINUS:
-            return left - right
-        elif expr.operator.token_type == TokenType.SLASH:
-            return left / right
-        elif expr.operator.token_type == TokenType.STAR:
-            return left * right
-        elif expr.operator.token_type == TokenType.PLUS:
-            # overloaded to support both number and string operands
-            # NB: not casting to double; the underlying type could be an int or float
-            if isinstance(left, Number) and isinstance(right, Number):
-                return left + right
-            elif isinstance(left, str) and isinstance(right, str):
-                return left + right
-            else:
-                raise InterpretationError("mismatched types")
-        elif expr.operator.token_type == TokenType.GREATER:
-            return left > right
-        elif expr.operator.token_type == TokenType.GREATER_EQUAL:
-            return left >= right
-        elif expr.operator.token_type == TokenType.LESS:
-            return left < right
-        elif expr.operator.token_type == TokenType.LESS_EQUAL:
-            return left <= right
-        elif expr.operator.token_type == TokenType.BANG_EQUAL:
-            return not self.is_equal(left, right)
-        elif expr.operator.token_type == TokenType.EQUAL_EQUAL:
-            return self.is_equal(left, right)
-
-        # unreachable
-        return None
+        return BIN_OPS[expr.operator.token_type](left, right)
 
     def visit_expression(self, stmt: Expression) -> None:
         self.evaluate(stmt.expression)
@@ -110,6 +113,28 @@ class Interpreter(Visitor):
         print(self.stringify(value))
         return None
 
+    @staticmethod
+    def plus(left, right) -> Any:
+        """
+        `+` is overloaded to support both number and string operands
+        NB: not casting to double; the underlying type could be an int or float
+        """
+        if type(left) in _NUMERIC_TYPES and type(right) in _NUMERIC_TYPES:
+            return left + right
+        elif type(left) is str and type(right) is str:
+            return left + right
+        else:
+            raise InterpretationError("mismatched types")
+
+    @classmethod
+    def negate(cls, operator: Token, right) -> Any:
+        cls.check_number_operand(operator, right)
+        return -1 * float(right)
+
+    @classmethod
+    def logical_not(cls, operator: Token, right) -> bool:
+        return not cls.is_truthy(right)
+
     @staticmethod
     def stringify(obj) -> str:
         if obj is None:
@@ -130,13 +155,13 @@ class Interpreter(Visitor):
         """
         if obj is None:
             return False
-        elif isinstance(obj, bool):
+        elif type(obj) is bool:
             return obj
         return True
 
     @staticmethod
     def check_number_operand(operator: Token, right: Any):
-        if not isinstance(right, Number):
+        if type(right) not in _NUMERIC_TYPES:
             raise LoxRuntimeError(operator, "Operand must be a number")
 
     @staticmethod
@@ -146,3 +171,25 @@ class Interpreter(Visitor):
         python is smart enough to handle this
         """
         return a == b
+
+
+# maps operator -> handler; NB: TokenType hashes by identity, so the lookup is cheap.
+# The operator module functions are implemented in C, unlike equivalent lambdas
+BIN_OPS = {
+    TokenType.MINUS: operator.sub,
+    TokenType.SLASH: operator.truediv,
+    TokenType.STAR: operator.mul,
+    TokenType.PLUS: Interpreter.plus,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.BANG_EQUAL: lambda a, b: not Interpreter.is_equal(a, b),
+    TokenType.EQUAL_EQUAL: Interpreter.is_equal,
+}
+
+# unary handlers take the operator token too, for reporting runtime errors
+UN_OPS = {
+    TokenType.BANG: Interpreter.logical_not,
+    TokenType.MINUS: Interpreter.negate,
+}
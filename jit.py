@@ -0,0 +1,118 @@
+"""
+Compiled fast path for the vm, using numba
+
+This only handles numeric chunks (see Chunk.numeric), i.e. where every
+value is a float; so the dispatch loop can run over typed arrays. numba
+(and numpy) are optional; without them, the vm always runs in python.
+They're only imported once a chunk is run here (see _compile), since
+importing them takes far longer than the vm takes to run most scripts
+"""
+import importlib.util
+from typing import List, Optional
+
+from bytecode import (Chunk, OP_ADD, OP_CONSTANT, OP_CONSTANT_LONG, OP_DIVIDE, OP_MULTIPLY, OP_NEGATE, OP_POP, OP_PRINT,
+                      OP_RETURN, OP_SUBTRACT)
+
+# NB: this checks that numba is installed, without importing it
+ENABLED = importlib.util.find_spec('numba') is not None
+
+# minimum length of code (in bytes) to use the fast path for. The first chunk run
+# here pays for importing numba and numpy, and loading _run from numba's cache: ~0.7s
+# (~0.9s if _run is compiled instead). The fast path saves ~0.2us per byte over the
+# vm, so chunks break even at ~4MB; at this size, the fast path takes about half as long
+THRESHOLD = 1 << 23
+
+np = None
+# _run, compiled by numba; see _compile
+_compiled_run = None
+
+
+def _run(code, constants, stack, out) -> int:
+    """
+    dispatch loop over typed arrays; mirrors VM.run for numeric opcodes.
+    Printed values are written to `out`, since there's no
+    printing from compiled code. Returns the number of
+    values printed, or -1 on an unexpected opcode
+    """
+    ip = 0
+    sp = 0  # points to next free slot in stack
+    n_out = 0
+    while True:
+        instruction = code[ip]
+        ip += 1
+        if instruction == OP_CONSTANT:
+            stack[sp] = constants[code[ip] * 256 + code[ip + 1]]
+            sp += 1
+            ip += 2
+        elif instruction == OP_CONSTANT_LONG:
+            stack[sp] = constants[code[ip] * 65536 + code[ip + 1] * 256 + code[ip + 2]]
+            sp += 1
+            ip += 3
+        elif instruction == OP_ADD:
+            sp -= 1
+            stack[sp - 1] = stack[sp - 1] + stack[sp]
+        elif instruction == OP_SUBTRACT:
+            sp -= 1
+            stack[sp - 1] = stack[sp - 1] - stack[sp]
+        elif instruction == OP_MULTIPLY:
+            sp -= 1
+            stack[sp - 1] = stack[sp - 1] * stack[sp]
+        elif instruction == OP_DIVIDE:
+            sp -= 1
+            stack[sp - 1] = stack[sp - 1] / stack[sp]
+        elif instruction == OP_NEGATE:
+            stack[sp - 1] = -stack[sp - 1]
+        elif instruction == OP_PRINT:
+            sp -= 1
+            out[n_out] = stack[sp]
+            n_out += 1
+        elif instruction == OP_POP:
+            sp -= 1
+        elif instruction == OP_RETURN:
+            return n_out
+        else:
+            return -1
+
+
+def _compile():
+    """
+    import numba and numpy, and compile _run; done on first use
+    """
+    global np, _compiled_run
+    import numba
+    import numpy
+    np = numpy
+    # NB: cache persists the compiled function across runs
+    _compiled_run = numba.njit(cache=True)(_run)
+
+
+def run(chunk: Chunk) -> Optional[List[float]]:
+    """
+    run numeric `chunk` and return the printed values; or None if the chunk
+    couldn't be run to completion, in which case it should be rerun on the vm.
+    NB: since nothing is printed here, rerunning has no visible side-effects
+    """
+    global ENABLED
+    if _compiled_run is None:
+        try:
+            _compile()
+        except ImportError:
+            # e.g. numba is installed, but numpy isn't importable
+            ENABLED = False
+            return None
+    code = np.frombuffer(chunk.code, dtype=np.uint8)
+    constants = np.array(chunk.constants, dtype=np.float64)
+    # every value on the stack (or printed) was pushed by a constant op, which takes
+    # at least 3 bytes, so the length of the code bounds both. NB: not the number
+    # of constants, since constants are shared
+    size = len(chunk.code) // 3 + 1
+    stack = np.empty(size, dtype=np.float64)
+    out = np.empty(size, dtype=np.float64)
+    try:
+        n_out = _compiled_run(code, constants, stack, out)
+    except ZeroDivisionError:
+        # let the vm raise this, after any preceding prints
+        return None
+    if n_out < 0:
+        return None
+    return out[:n_out].tolist()
@@ -3,20 +3,19 @@ import sys
 from typing import List
 
 from astprinter import AstPrinter
+from compiler import Compiler
 from loxparser import Parser
-from interpreter import Interpreter
 from reporting import ErrorReporter
 from scanner import Scanner
+from vm import VM
 
 
 # UTILS
 
 
-def read_file(filepath: str):
-    contents = ''
-    with open(filepath, 'r') as fp:
-        fp.read()
-    return contents
+def read_file(filepath: str) -> str:
+    with open(filepath, 'r', encoding='utf-8') as fp:
+        return fp.read()
 
 
 # MAIN LOGIC
@@ -24,27 +23,35 @@ def read_file(filepath: str):
 class Lox:
 
     def __init__(self):
-        self.error_reporter = ErrorReporter()
+        # NB: errors are batched, and written once per run; see run
+        self.error_reporter = ErrorReporter(batch=True)
         # needed for persisting global variables (not yet supported)
-        self.interpreter = Interpreter(self.error_reporter)
+        self.vm = VM(self.error_reporter)
 
     def run(self, source: str):
         """
         run `source` code
         """
-        scanner = Scanner(source, self.error_reporter)
-        tokens = scanner.scan_tokens()
-        # print tokens
-        # for token in tokens:
-        #    print(token)
-        parser = Parser(tokens, self.error_reporter)
-        statements = parser.parse()
-        if self.error_reporter.had_error:
-            # there was error; lazily exit
-            return
-
-        # print(AstPrinter().print(expression))
-        self.interpreter.interpret(statements)
+        try:
+            scanner = Scanner(source, self.error_reporter)
+            tokens = scanner.scan_tokens()
+            # print tokens
+            # for token in tokens:
+            #    print(token)
+            parser = Parser(tokens, self.error_reporter)
+            statements = parser.parse()
+            if self.error_reporter.had_error:
+                # there was error; lazily exit
+                return
+
+            # print(AstPrinter().print(expression))
+            chunk = Compiler(self.error_reporter).compile(statements)
+            if chunk is None:
+                return
+            self.vm.interpret(chunk)
+        finally:
+            # NB: errors are buffered; write them once per run
+            self.error_reporter.flush()
 
     def run_prompt(self):
         """
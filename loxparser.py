@@ -1,17 +1,72 @@
 # needed for postponed evaluations, e.g. so types can be forward referenced
 from __future__ import annotations
 
-from typing import Any, List
+import functools
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from expression import Binary, Expr, Expression, Grouping, Literal, Print, Stmt, Unary
+from expression import Binary, Expr, Expression, Literal, Print, Stmt, Unary
 from loxtoken import TokenType, Token
 
 
+# token types used by the grammar rules; NB: module-level names are cheaper
+# to load than enum members, i.e. attributes of TokenType
+_EOF = TokenType.EOF
+_LEFT_PAREN = TokenType.LEFT_PAREN
+_PRINT = TokenType.PRINT
+_RIGHT_PAREN = TokenType.RIGHT_PAREN
+_SEMICOLON = TokenType.SEMICOLON
+
+# literals for singleton values; these are shared by all
+# occurrences, since nodes aren't mutated after parsing
+_LIT_TRUE = Literal(True)
+_LIT_FALSE = Literal(False)
+_LIT_NIL = Literal(None)
+_KEYWORD_LITERALS = {
+    TokenType.FALSE: _LIT_FALSE,
+    TokenType.TRUE: _LIT_TRUE,
+    TokenType.NIL: _LIT_NIL,
+}
+
+# operators (token types) for each grammar rule; sets so
+# matching the current token is a single membership test
+_EQUALITY_OPS = frozenset({TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL})
+_COMPARISON_OPS = frozenset({TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL})
+_TERM_OPS = frozenset({TokenType.MINUS, TokenType.PLUS})
+_FACTOR_OPS = frozenset({TokenType.SLASH, TokenType.STAR})
+_UNARY_OPS = frozenset({TokenType.BANG, TokenType.MINUS})
+_LITERAL_TYPES = frozenset({TokenType.NUMBER, TokenType.STRING})
+
+# token types that start a statement; the parser resynchronizes on these after an error
+_SYNC_TYPES = frozenset({TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.FOR, TokenType.IF,
+                         TokenType.WHILE, TokenType.PRINT, TokenType.RETURN})
+
+
 class ParseError(Exception):
     """
     """
 
 
+def memo_rule(rule: Callable) -> Callable:
+    """
+    packrat memoization for a grammar rule: the rule's result, and where it
+    ended, are cached by the position it started at, so parsing the same
+    rule from the same position again, e.g. when backtracking, is a lookup.
+    NB: failures (ParseError) aren't cached
+    """
+    @functools.wraps(rule)
+    def memoized(self) -> Expr:
+        key = (rule, self.current)
+        # NB: get, rather than try/except; nearly every lookup is a miss
+        hit = self.memo.get(key)
+        if hit is not None:
+            expr, self.current = hit
+            return expr
+        expr = rule(self)
+        self.memo[key] = (expr, self.current)
+        return expr
+    return memoized
+
+
 class Parser:
     """
     parser
@@ -42,31 +97,50 @@ class Parser:
         self.tokens = tokens
         self.current = 0  # points to token to parse
         self.error_reporter = error_reporter
+        # packrat memo, i.e. (rule, start position) -> (result, end position); see memo_rule
+        self.memo: Dict[Tuple[Callable, int], Tuple[Expr, int]] = {}
 
-    def declaration(self):
+    def declaration(self) -> Optional[Stmt]:
         """
-        pass
+        declaration    → statement ;
+
+        NB: varDecl isn't supported yet. On a parse error, this
+        synchronizes to the next statement and returns None
         """
+        try:
+            return self.statement()
+        except ParseError:
+            self.synchronize()
+            return None
 
     def statement(self) -> Stmt:
-        if self.match(TokenType.PRINT):
+        # NB: the parser never backtracks past the start of a statement,
+        # so memoized results from earlier statements can't be reused
+        if self.memo:
+            self.memo.clear()
+        if self.tokens[self.current].token_type is _PRINT:
+            self.current += 1
             return self.print_statement()
 
         return self.expression_statement()
 
     def print_statement(self):
         value = self.expression()
-        self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
+        self.consume(_SEMICOLON, "Expect ';' after value.")
         return Print(value)
 
     def expression_statement(self):
         expr = self.expression()
-        self.consume(TokenType.SEMICOLON, "Expect ';' after value.")
+        self.consume(_SEMICOLON, "Expect ';' after value.")
         return Expression(expr)
 
+    @memo_rule
     def expression(self) -> Expr:
         """
         expression     → equality ;
+
+        NB: only expression is memoized, i.e. once per statement and
+        per grouping; memoizing every rule would cost a lookup per node
         """
         return self.equality()
 
@@ -74,98 +148,111 @@ class Parser:
         """
         equality       → comparison ( ( "!=" | "==" ) comparison )* ;
         """
+        tokens = self.tokens
         expr = self.comparison()
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
+        operator = tokens[self.current]
+        while operator.token_type in _EQUALITY_OPS:
+            self.current += 1
             right = self.comparison()
             expr = Binary(expr, operator, right)
+            operator = tokens[self.current]
         return expr
 
     def comparison(self) -> Expr:
         """
         comparison → term ( ( ">" | ">=" | "<" | "<=" ) term )*
         """
+        tokens = self.tokens
         expr = self.term()
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
+        operator = tokens[self.current]
+        while operator.token_type in _COMPARISON_OPS:
+            self.current += 1
             right = self.term()
             expr = Binary(expr, operator, right)
+            operator = tokens[self.current]
         return expr
 
     def term(self) -> Expr:
         """
         term  → factor ( ( "-" | "+" ) factor )* ;
         """
+        tokens = self.tokens
         expr = self.factor()
         # minus, then plus, due to order of precedence
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
+        operator = tokens[self.current]
+        while operator.token_type in _TERM_OPS:
+            self.current += 1
             right = self.factor()
             expr = Binary(expr, operator, right)
+            operator = tokens[self.current]
         return expr
 
     def factor(self) -> Expr:
         """
         factor         → unary ( ( "/" | "*" ) unary )* ;
         """
+        tokens = self.tokens
         expr = self.unary()
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
+        operator = tokens[self.current]
+        while operator.token_type in _FACTOR_OPS:
+            self.current += 1
             right = self.unary()
             expr = Binary(expr, operator, right)
+            operator = tokens[self.current]
         return expr
 
     def unary(self) -> Expr:
         """
         unary          → ( "!" | "-" ) unary
                       | primary ;
-        """
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
 
-        return self.primary()
+        NB: a run of prefix operators is parsed iteratively,
+        rather than recursing once per operator
+        """
+        tokens = self.tokens
+        operator = tokens[self.current]
+        if operator.token_type not in _UNARY_OPS:
+            return self.primary()
+
+        operators = []
+        while operator.token_type in _UNARY_OPS:
+            operators.append(operator)
+            self.current += 1
+            operator = tokens[self.current]
+        expr = self.primary()
+        # fold right-to-left, i.e. the innermost operator applies first
+        for operator in reversed(operators):
+            expr = Unary(operator, expr)
+        return expr
 
     def primary(self) -> Expr:
         """
         primary     → NUMBER | STRING | "true" | "false" | "nil"
                     | "(" expression ")" ;
         """
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-        elif self.match(TokenType.TRUE):
-            return Literal(True)
-        elif self.match(TokenType.NIL):
-            return Literal(None)
-        elif self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
-        elif self.match(TokenType.LEFT_PAREN):
+        token = self.tokens[self.current]
+        token_type = token.token_type
+        # NB: none of these branches match EOF, so there's no need to check is_at_end
+        if token_type in _KEYWORD_LITERALS:
+            self.current += 1
+            return _KEYWORD_LITERALS[token_type]
+        elif token_type in _LITERAL_TYPES:
+            self.current += 1
+            return Literal(token.literal)
+        elif token_type is _LEFT_PAREN:
+            self.current += 1
             expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expr)
+            self.consume(_RIGHT_PAREN, "Expect ')' after expression.")
+            # NB: not wrapping in a Grouping node; the grouping only
+            # determines precedence, which the tree's shape already encodes
+            return expr
         else:
-            raise self.error(self.peek(), "Expect expression.")
+            raise self.error(token, "Expect expression.")
 
     # section : helper methods
-
-    def match(self, *types: List[TokenType]) -> bool:
-        """
-        if any of `types` match the current type consume and return True
-        """
-        for token_type in types:
-            if self.check(token_type):
-                self.advance()
-                return True
-        return False
-
-    def check(self, token_type: TokenType):
-        """
-        return True if `token_type` matches current token
-        """
-        if self.is_at_end():
-            return False
-        return self.peek().token_type == token_type
+    # NB: the hot grammar rules (statement ... primary) index
+    # self.tokens directly, rather than calling these; they're
+    # left for the error path, i.e. synchronize
 
     def advance(self) -> Token:
         """
@@ -181,12 +268,15 @@ class Parser:
         check whether next token matches expectation; otherwise
         raises exception
         """
-        if self.check(token_type):
-            return self.advance()
-        raise self.error(self.peek(), message)
+        token = self.tokens[self.current]
+        # NB: EOF can't be consumed, i.e. current never moves past it
+        if token.token_type is token_type and token_type is not _EOF:
+            self.current += 1
+            return token
+        raise self.error(token, message)
 
     def is_at_end(self) -> bool:
-        return self.peek().token_type == TokenType.EOF
+        return self.tokens[self.current].token_type is _EOF
 
     def peek(self) -> Token:
         return self.tokens[self.current]
@@ -207,10 +297,9 @@ class Parser:
         """
         self.advance()
         while self.is_at_end() is False:
-            if self.previous().token_type == TokenType.SEMICOLON:
+            if self.previous().token_type is _SEMICOLON:
                 return
-            if self.peek().token_type in [TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.FOR, TokenType.IF,
-                                          TokenType.WHILE, TokenType.PRINT, TokenType.RETURN]:
+            if self.peek().token_type in _SYNC_TYPES:
                 return
             self.advance()
 
@@ -58,6 +58,11 @@ class TokenType(Enum):
     WHILE = auto()
     EOF = auto()
 
+    # NB: members are singletons, and compared by identity, so hash by identity too;
+    # Enum.__hash__ hashes the member's name in python, which makes
+    # every set/dict lookup keyed by TokenType (e.g. in the parser) expensive
+    __hash__ = object.__hash__
+
 
 KEYWORDS = {
     "and": TokenType.AND,
@@ -79,6 +84,9 @@ KEYWORDS = {
 
 
 class Token:
+    # NB: no per-token __dict__; there's one token per lexeme
+    __slots__ = ('token_type', 'lexeme', 'literal', 'line')
+
     def __init__(self, token_type: TokenType, lexeme: str, literal: Any, line: int):
         self.token_type = token_type
         self.lexeme = lexeme
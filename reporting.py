@@ -1,18 +1,22 @@
 import sys
-import os
 
-# be careful, this may causes circular import
-from scanner import TokenType
+from loxtoken import TokenType
 
 
 class ErrorReporter:
     """
     handles reporting error
+
+    NB: errors are written (to stderr) as they're reported; unless `batch`
+    is set, in which case they're buffered, and only written on flush
     """
 
-    def __init__(self):
+    def __init__(self, batch: bool = False):
         self.had_error = False
         self.had_runtime_error = False
+        self.batch = batch
+        # formatted errors, not yet written
+        self.pending = []
 
     def scan_error(self, line: int, message: str):
         """
@@ -25,7 +29,7 @@ class ErrorReporter:
         """
         report parsing error
         """
-        if token.token_type == TokenType.EOF:
+        if token.token_type is TokenType.EOF:
             self.report(token.line, " at end", message)
         else:
             self.report(token.line, f" at '{token.lexeme}'", message)
@@ -34,14 +38,38 @@ class ErrorReporter:
         """
         report a runtime error
         """
-        output = f'{error.get_message()}{os.linesep}[line {error.token.line}]'
-        print(output, file=sys.stderr)
-        self.had_runtime_error = False
+        output = f'{error.get_message()}\n[line {error.operator.line}]'
+        self.write(output)
+        self.had_runtime_error = True
+
+    def compile_error(self, message: str):
+        """
+        report a compile error; NB: these aren't tied to a token (or line)
+        """
+        self.write(f'Error: {message}')
+        self.had_error = True
 
     def report(self, line: int, where: str, message: str):
         """
         report a non-runtime error
         """
         output = f'[line {line}] Error{where}: {message}'
-        print(output, file=sys.stderr)
+        self.write(output)
         self.had_error = True
+
+    def write(self, output: str):
+        """
+        write `output` now, or on flush if batching
+        """
+        self.pending.append(output)
+        if not self.batch:
+            self.flush()
+
+    def flush(self):
+        """
+        write pending errors, with a single write
+        """
+        if self.pending:
+            sys.stderr.write('\n'.join(self.pending) + '\n')
+            sys.stderr.flush()
+            self.pending.clear()
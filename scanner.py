@@ -1,17 +1,57 @@
 from __future__ import annotations
 
+from array import array
 from typing import List, Any
 
 from loxtoken import TokenType, Token, KEYWORDS
 
+try:
+    # NB: optional compiled scanner; see scanner_cy.pyx
+    from scanner_cy import scan as _compiled_scan
+except ImportError:
+    _compiled_scan = None
+
 """
 NOTES: importing ErrorReporter, leads to circular dependency issue
 """
 
+# chars, as codes; the scanner compares ints, rather than 1-char strs
+_LPAREN = ord('(')
+_RPAREN = ord(')')
+_LBRACE = ord('{')
+_RBRACE = ord('}')
+_COMMA = ord(',')
+_DOT = ord('.')
+_MINUS = ord('-')
+_PLUS = ord('+')
+_SEMICOLON = ord(';')
+_STAR = ord('*')
+_BANG = ord('!')
+_EQUAL = ord('=')
+_LESS = ord('<')
+_GREATER = ord('>')
+_SLASH = ord('/')
+_SPACE = ord(' ')
+_RETURN = ord('\r')
+_TAB = ord('\t')
+_NEWLINE = ord('\n')
+_QUOTE = ord('"')
+_NUL = 0
+
+# NB: set membership is cheaper than chained range compares (or a function call) per char
+_DIGITS = frozenset(b'0123456789')
+_ALPHAS = frozenset(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+# NB: excludes '_', as str.isalnum did
+_ALNUMS = frozenset(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+
 
 class Scanner:
+    __slots__ = ('source', 'codes', 'tokens', 'start', 'current', 'line', 'error_reporter')
+
     def __init__(self, source: str, error_reporter: 'ErrorReporter'):
         self.source = source
+        # code of each char in source, for the python loop; set by scan_tokens
+        self.codes = None
         self.tokens = []
 
         self.start = 0
@@ -21,52 +61,65 @@ class Scanner:
 
     def is_at_end(self) -> bool:
         """return true if scanner is at end of the source"""
-        return self.current >= len(self.source)
+        return self.current >= len(self.codes)
 
-    def advance(self) -> str:
-        char = self.source[self.current]
+    def advance(self) -> int:
+        code = self.codes[self.current]
         self.current += 1
-        return char
+        return code
 
-    def match(self, expected: str):
+    def match(self, expected: int):
         """
         conditionally increment current ptr, if current
         char matches expected
         """
         if self.is_at_end():
             return False
-        if self.source[self.current] != expected:
+        if self.codes[self.current] != expected:
             return False
 
         # conditionally increment on match
         self.current += 1
         return True
 
-    def peek(self) -> str:
+    def peek(self) -> int:
         """
         return next character, without consuming it
         """
         if self.is_at_end():
-            return '\0'
-        return self.source[self.current]
+            return _NUL
+        return self.codes[self.current]
 
-    def peek_next(self) -> str:
+    def peek_next(self) -> int:
         """
         returns next to next lookahead character
         """
-        if self.current + 1 >= len(self.source):
-            return '\0'
-        return self.source[self.current + 1]
+        if self.current + 1 >= len(self.codes):
+            return _NUL
+        return self.codes[self.current + 1]
 
     def scan_tokens(self) -> List[Token]:
         """
         scan source and return list of scanned tokens
         """
-        while self.is_at_end() is False:
-            self.start = self.current
-            self.scan_token()
-
-        self.add_token(TokenType.EOF, 'EOF')
+        is_ascii = self.source.isascii()
+        # NB: the compiled scanner walks bytes, so only use it when chars and bytes coincide
+        if _compiled_scan is not None and self.current == 0 and is_ascii:
+            tokens, self.line = _compiled_scan(self.source, self.error_reporter.scan_error)
+            self.tokens.extend(tokens)
+            self.current = len(self.source)
+        else:
+            # NB: indexing bytes (or an array) gives an int, so each char is compared as
+            # an int. Non-ascii sources can't use bytes, since the offsets of chars and
+            # (utf-8) bytes would differ; they use an array of 4-byte codes instead, i.e.
+            # no object per char, unlike a list. The compiled path doesn't need these
+            self.codes = self.source.encode('ascii') if is_ascii else array('I', map(ord, self.source))
+            while self.is_at_end() is False:
+                self.start = self.current
+                self.scan_token()
+
+        # NB: EOF has no lexeme
+        self.tokens.append(Token(TokenType.EOF, '', 'EOF', self.line))
         return self.tokens
 
     def add_token(self, token_type: TokenType, literal: Any = None):
@@ -78,13 +131,14 @@ class Scanner:
         """
         tokenize string
         """
-        while self.peek() != '"' and self.is_at_end() is False:
-            if self.peek() == '\n':  # supports multiline strings
+        while self.peek() != _QUOTE and self.is_at_end() is False:
+            if self.peek() == _NEWLINE:  # supports multiline strings
                 self.line += 1
             self.advance()
 
         if self.is_at_end():
             self.error_reporter.scan_error(self.line, f'Unterminated string')
+            return
 
         # the closing "
         self.advance()
@@ -97,19 +151,20 @@ class Scanner:
         tokenize a number i.e. an integer or floating point
         """
         # whole-number part
-        while self.peek().isdigit():
+        while self.peek() in _DIGITS:
             self.advance()
 
         # fractional part
-        if self.peek() == '.' and self.peek_next().isdigit():
+        if self.peek() == _DOT and self.peek_next() in _DIGITS:
             # consume the "."
             self.advance()
 
-            while self.peek().isdigit():
+            while self.peek() in _DIGITS:
                 self.advance()
 
-        value = float(self.source[self.start: self.current])
-        self.add_token(TokenType.NUMBER, value)
+        # NB: the lexeme is sliced once, and is also parsed for the value
+        text = self.source[self.start: self.current]
+        self.tokens.append(Token(TokenType.NUMBER, text, float(text), self.line))
 
     def tokenize_identifier(self):
         """
@@ -117,75 +172,75 @@ class Scanner:
         is a keyword. If so, add keyword token. Otherwise,
         add as identifier.
         """
-        while self.peek().isalnum():
+        while True:
+            code = self.peek()
+            # non-ascii identifiers are allowed, as before
+            if not (code in _ALNUMS or code >= 0x80 and chr(code).isalnum()):
+                break
             self.advance()
+        # NB: the identifier is sliced once, and is both the keyword key and the lexeme
         identifier = self.source[self.start: self.current]
-        if identifier in KEYWORDS:
-            # reserved keyword
-            token_type = KEYWORDS[identifier]
-            self.add_token(token_type)
-        else:
-            # identifier
-            self.add_token(TokenType.IDENTIFIER)
+        token_type = KEYWORDS.get(identifier, TokenType.IDENTIFIER)
+        self.tokens.append(Token(token_type, identifier, None, self.line))
 
     def scan_token(self):
         """
 
         """
         char = self.advance()
-        if char == '(':
+        if char == _LPAREN:
             self.add_token(TokenType.LEFT_PAREN)
-        elif char == ')':
+        elif char == _RPAREN:
             self.add_token(TokenType.RIGHT_PAREN)
-        elif char == '{':
+        elif char == _LBRACE:
             self.add_token(TokenType.LEFT_BRACE)
-        elif char == '}':
+        elif char == _RBRACE:
             self.add_token(TokenType.RIGHT_BRACE)
-        elif char == ',':
+        elif char == _COMMA:
             self.add_token(TokenType.COMMA)
-        elif char == '.':
+        elif char == _DOT:
             self.add_token(TokenType.DOT)
-        elif char == '-':
+        elif char == _MINUS:
             self.add_token(TokenType.MINUS)
-        elif char == '+':
+        elif char == _PLUS:
             self.add_token(TokenType.PLUS)
-        elif char == ';':
+        elif char == _SEMICOLON:
             self.add_token(TokenType.SEMICOLON)
-        elif char == '*':
+        elif char == _STAR:
             self.add_token(TokenType.STAR)
         # for these look at second char
-        elif char == '!':
-            token_type = TokenType.BANG_EQUAL if self.match('=') else TokenType.BANG
+        elif char == _BANG:
+            token_type = TokenType.BANG_EQUAL if self.match(_EQUAL) else TokenType.BANG
             self.add_token(token_type)
-        elif char == '=':
-            token_type = TokenType.EQUAL_EQUAL if self.match('=') else TokenType.EQUAL
+        elif char == _EQUAL:
+            token_type = TokenType.EQUAL_EQUAL if self.match(_EQUAL) else TokenType.EQUAL
             self.add_token(token_type)
-        elif char == '<':
-            token_type = TokenType.LESS_EQUAL if self.match('=') else TokenType.LESS
+        elif char == _LESS:
+            token_type = TokenType.LESS_EQUAL if self.match(_EQUAL) else TokenType.LESS
             self.add_token(token_type)
-        elif char == '>':
-            token_type = TokenType.GREATER_EQUAL if self.match('=') else TokenType.GREATER
+        elif char == _GREATER:
+            token_type = TokenType.GREATER_EQUAL if self.match(_EQUAL) else TokenType.GREATER
             self.add_token(token_type)
-        elif char == '/':
-            if self.match('/'):
+        elif char == _SLASH:
+            if self.match(_SLASH):
                 # comment goes to the end of the line
-                while self.peek() != '\n' and self.is_at_end() is False:
+                while self.peek() != _NEWLINE and self.is_at_end() is False:
                     self.advance()
             else:
                 self.add_token(TokenType.SLASH)
-        elif char == ' ' or char == '\r' or char == '\t':
+        elif char == _SPACE or char == _RETURN or char == _TAB:
             # ignore whitespace
             pass
-        elif char == '\n':
+        elif char == _NEWLINE:
             self.line += 1
-        elif char == '"':  # handle string literal
+        elif char == _QUOTE:  # handle string literal
             self.tokenize_string()
-        elif char.isdigit():  # handle numeric literal
+        elif char in _DIGITS:  # handle numeric literal
             self.tokenize_number()
-        elif char.isidentifier():
+        elif char in _ALPHAS or char >= 0x80 and chr(char).isidentifier():
             self.tokenize_identifier()
         else:
-            self.error_reporter.scan_error(self.line, f'Unexpected character [{char}]')
+            self.error_reporter.scan_error(self.line, f'Unexpected character [{chr(char)}]')
 
 
 if __name__ == '__main__':
@@ -194,4 +249,4 @@ if __name__ == '__main__':
     src = 'x = "meow"'
     scanner = Scanner(src, ErrorReporter())
     tokens = scanner.scan_tokens()
-    print(tokens)
\ No newline at end of file
+    print(tokens)
@@ -0,0 +1,198 @@
+# cython: language_level=3
+"""
+Compiled version of Scanner.scan_tokens' loop (see scanner.py); it's
+optional, and only used when built, i.e. via:
+    cythonize -i scanner_cy.pyx
+
+This walks the source's bytes with a char pointer, rather than indexing a python
+str one char at a time. It must produce the same tokens (and errors) as Scanner
+"""
+from loxtoken import KEYWORDS, Token, TokenType
+
+# NB: module-level refs, so the loop doesn't look up enum members
+LEFT_PAREN = TokenType.LEFT_PAREN
+RIGHT_PAREN = TokenType.RIGHT_PAREN
+LEFT_BRACE = TokenType.LEFT_BRACE
+RIGHT_BRACE = TokenType.RIGHT_BRACE
+COMMA = TokenType.COMMA
+DOT = TokenType.DOT
+MINUS = TokenType.MINUS
+PLUS = TokenType.PLUS
+SEMICOLON = TokenType.SEMICOLON
+SLASH = TokenType.SLASH
+STAR = TokenType.STAR
+BANG = TokenType.BANG
+BANG_EQUAL = TokenType.BANG_EQUAL
+EQUAL = TokenType.EQUAL
+EQUAL_EQUAL = TokenType.EQUAL_EQUAL
+GREATER = TokenType.GREATER
+GREATER_EQUAL = TokenType.GREATER_EQUAL
+LESS = TokenType.LESS
+LESS_EQUAL = TokenType.LESS_EQUAL
+IDENTIFIER = TokenType.IDENTIFIER
+STRING = TokenType.STRING
+NUMBER = TokenType.NUMBER
+
+# chars, as codes
+cdef unsigned char C_LEFT_PAREN = 40  # (
+cdef unsigned char C_RIGHT_PAREN = 41  # )
+cdef unsigned char C_LEFT_BRACE = 123  # {
+cdef unsigned char C_RIGHT_BRACE = 125  # }
+cdef unsigned char C_COMMA = 44  # ,
+cdef unsigned char C_DOT = 46  # .
+cdef unsigned char C_MINUS = 45  # -
+cdef unsigned char C_PLUS = 43  # +
+cdef unsigned char C_SEMICOLON = 59  # ;
+cdef unsigned char C_STAR = 42  # *
+cdef unsigned char C_BANG = 33  # !
+cdef unsigned char C_EQUAL = 61  # =
+cdef unsigned char C_LESS = 60  # <
+cdef unsigned char C_GREATER = 62  # >
+cdef unsigned char C_SLASH = 47  # /
+cdef unsigned char C_SPACE = 32
+cdef unsigned char C_RETURN = 13  # \r
+cdef unsigned char C_TAB = 9  # \t
+cdef unsigned char C_NEWLINE = 10  # \n
+cdef unsigned char C_QUOTE = 34  # "
+cdef unsigned char C_UNDERSCORE = 95  # _
+
+# numbers with at most this many digits are < 2**53, i.e. exact as doubles
+cdef int MAX_EXACT_DIGITS = 15
+
+
+cdef inline bint is_digit(unsigned char c):
+    return 48 <= c <= 57
+
+
+cdef inline bint is_alpha(unsigned char c):
+    # NB: matches str.isidentifier, for the first char of an ascii identifier
+    return 65 <= c <= 90 or 97 <= c <= 122 or c == C_UNDERSCORE
+
+
+cdef inline bint is_alnum(unsigned char c):
+    return 65 <= c <= 90 or 97 <= c <= 122 or 48 <= c <= 57
+
+
+cpdef tuple scan(str source, object scan_error):
+    """
+    scan `source`, which must be ascii, so that byte and char offsets
+    coincide. Errors are reported via `scan_error(line, message)`.
+    Returns (tokens, line); NB: the EOF token is added by the caller
+    """
+    cdef bytes src = source.encode('ascii')
+    cdef const unsigned char *p = src
+    cdef Py_ssize_t n = len(src)
+    cdef Py_ssize_t pos = 0
+    cdef Py_ssize_t start = 0
+    cdef int line = 1
+    cdef unsigned char c
+    cdef double mantissa, scale
+    cdef int ndigits
+    cdef list tokens = []
+
+    while pos < n:
+        start = pos
+        c = p[pos]
+        pos += 1
+        if c == C_LEFT_PAREN:
+            tokens.append(Token(LEFT_PAREN, source[start:pos], None, line))
+        elif c == C_RIGHT_PAREN:
+            tokens.append(Token(RIGHT_PAREN, source[start:pos], None, line))
+        elif c == C_LEFT_BRACE:
+            tokens.append(Token(LEFT_BRACE, source[start:pos], None, line))
+        elif c == C_RIGHT_BRACE:
+            tokens.append(Token(RIGHT_BRACE, source[start:pos], None, line))
+        elif c == C_COMMA:
+            tokens.append(Token(COMMA, source[start:pos], None, line))
+        elif c == C_DOT:
+            tokens.append(Token(DOT, source[start:pos], None, line))
+        elif c == C_MINUS:
+            tokens.append(Token(MINUS, source[start:pos], None, line))
+        elif c == C_PLUS:
+            tokens.append(Token(PLUS, source[start:pos], None, line))
+        elif c == C_SEMICOLON:
+            tokens.append(Token(SEMICOLON, source[start:pos], None, line))
+        elif c == C_STAR:
+            tokens.append(Token(STAR, source[start:pos], None, line))
+        # for these look at second char
+        elif c == C_BANG:
+            if pos < n and p[pos] == C_EQUAL:
+                pos += 1
+                tokens.append(Token(BANG_EQUAL, source[start:pos], None, line))
+            else:
+                tokens.append(Token(BANG, source[start:pos], None, line))
+        elif c == C_EQUAL:
+            if pos < n and p[pos] == C_EQUAL:
+                pos += 1
+                tokens.append(Token(EQUAL_EQUAL, source[start:pos], None, line))
+            else:
+                tokens.append(Token(EQUAL, source[start:pos], None, line))
+        elif c == C_LESS:
+            if pos < n and p[pos] == C_EQUAL:
+                pos += 1
+                tokens.append(Token(LESS_EQUAL, source[start:pos], None, line))
+            else:
+                tokens.append(Token(LESS, source[start:pos], None, line))
+        elif c == C_GREATER:
+            if pos < n and p[pos] == C_EQUAL:
+                pos += 1
+                tokens.append(Token(GREATER_EQUAL, source[start:pos], None, line))
+            else:
+                tokens.append(Token(GREATER, source[start:pos], None, line))
+        elif c == C_SLASH:
+            if pos < n and p[pos] == C_SLASH:
+                # comment goes to the end of the line
+                while pos < n and p[pos] != C_NEWLINE:
+                    pos += 1
+            else:
+                tokens.append(Token(SLASH, source[start:pos], None, line))
+        elif c == C_SPACE or c == C_RETURN or c == C_TAB:
+            # ignore whitespace
+            pass
+        elif c == C_NEWLINE:
+            line += 1
+        elif c == C_QUOTE:
+            while pos < n and p[pos] != C_QUOTE:
+                if p[pos] == C_NEWLINE:  # supports multiline strings
+                    line += 1
+                pos += 1
+            if pos >= n:
+                scan_error(line, 'Unterminated string')
+                continue
+            # the closing "
+            pos += 1
+            tokens.append(Token(STRING, source[start:pos], source[start + 1:pos - 1], line))
+        elif is_digit(c):
+            # NB: the value is accumulated while scanning, as digits / 10**(fractional digits);
+            # this is exact, i.e. the same as float(text), as long as both fit in a
+            # double's mantissa, since the division is correctly rounded
+            mantissa = c - 48
+            scale = 1.0
+            ndigits = 1
+            # whole-number part
+            while pos < n and is_digit(p[pos]):
+                mantissa = mantissa * 10 + (p[pos] - 48)
+                ndigits += 1
+                pos += 1
+            # fractional part
+            if pos + 1 < n and p[pos] == C_DOT and is_digit(p[pos + 1]):
+                pos += 1
+                while pos < n and is_digit(p[pos]):
+                    mantissa = mantissa * 10 + (p[pos] - 48)
+                    scale *= 10
+                    ndigits += 1
+                    pos += 1
+            text = source[start:pos]
+            if ndigits <= MAX_EXACT_DIGITS:
+                tokens.append(Token(NUMBER, text, mantissa / scale, line))
+            else:
+                tokens.append(Token(NUMBER, text, float(text), line))
+        elif is_alpha(c):
+            while pos < n and is_alnum(p[pos]):
+                pos += 1
+            text = source[start:pos]
+            tokens.append(Token(KEYWORDS.get(text, IDENTIFIER), text, None, line))
+        else:
+            scan_error(line, f'Unexpected character [{chr(c)}]')
+
+    return tokens, line
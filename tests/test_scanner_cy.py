@@ -0,0 +1,82 @@
+"""
+Differential check of the compiled scanner (scanner_cy.pyx) against
+Scanner's python loop; skipped unless the extension is built
+"""
+import random
+import unittest
+from unittest import mock
+
+import scanner
+
+try:
+    import scanner_cy
+except ImportError:
+    scanner_cy = None
+
+# NB: ascii only, since the compiled scanner is only used for ascii sources
+ALPHABET = '(){},.-+;*!=<>/ \r\t\n"0123456789..abcxyz_AZ#@' + '\0'
+WORDS = ['and', 'or', 'print', 'true', 'false', 'nil', 'var', 'while', 'printer', 'x1', '_y', '//', '1.5', '12.']
+
+CASES = [
+    '',
+    'print 1 + 2;',
+    'var x = "meow\nhi";\n',
+    '1.5.3 // comment\n 1. 23.x',
+    '"unterminated',
+    'a_b1 _x 9abc',
+    '!= == <= >= ! = < >',
+    '12345678901234567890.5 0.000000000000001 123456789012345',
+]
+
+
+class Reporter:
+    """
+    collects reported scan errors
+    """
+    def __init__(self):
+        self.errors = []
+
+    def scan_error(self, line: int, message: str):
+        self.errors.append((line, message))
+
+
+def scan(source: str, compiled_scan):
+    """
+    scan `source` with `compiled_scan` as the compiled path (None for the python loop)
+    and return the tokens, as tuples, and the reported errors
+    """
+    reporter = Reporter()
+    with mock.patch.object(scanner, '_compiled_scan', compiled_scan):
+        tokens = scanner.Scanner(source, reporter).scan_tokens()
+    return [(t.token_type, t.lexeme, t.literal, t.line) for t in tokens], reporter.errors
+
+
+@unittest.skipIf(scanner_cy is None, 'scanner_cy is not built')
+class CompiledScannerTest(unittest.TestCase):
+
+    def assert_same(self, source: str):
+        self.assertEqual(scan(source, None), scan(source, scanner_cy.scan), repr(source))
+
+    def test_cases(self):
+        for source in CASES:
+            self.assert_same(source)
+
+    def test_random_sources(self):
+        rng = random.Random(0)
+        for _ in range(5000):
+            if rng.random() < 0.5:
+                source = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 80)))
+            else:
+                source = ' '.join(rng.choice(WORDS + list(ALPHABET)) for _ in range(rng.randint(0, 30)))
+            self.assert_same(source)
+
+    def test_numbers(self):
+        rng = random.Random(1)
+        for _ in range(5000):
+            whole = str(rng.randint(0, 10 ** rng.randint(1, 18)))
+            fraction = str(rng.randint(0, 10 ** rng.randint(1, 18)))
+            self.assert_same(f'{whole}.{fraction} {whole}')
+
+
+if __name__ == '__main__':
+    unittest.main()
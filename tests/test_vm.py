@@ -0,0 +1,134 @@
+"""
+Differential check of the vm (compiler.py, vm.py), and its compiled
+fast path (jit.py), against the tree-walking Interpreter
+"""
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from compiler import Compiler
+from interpreter import Interpreter
+import jit
+from loxparser import Parser
+from reporting import ErrorReporter
+from scanner import Scanner
+from vm import VM
+
+# the repo's root, i.e. where the modules are
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMS = [
+    'print 1 + 2 * 3 - 4 / 8;',
+    'print (1 + 2) * -(3 - 4);',
+    'print "a" + "b"; print "a" == "a"; print "a" != "b";',
+    'print 1 < 2; print 2 <= 2; print 3 > 4; print 3 >= 4;',
+    'print nil; print true; print false; print !nil; print !0; print !!true;',
+    'print 1 == true; print nil == false; print 1 == 1.0; print "1" == 1;',
+    '1 + 2; print 3; true; "x";',
+    'print --1; print -(-(-2.5));',
+    # runtime error, after some output
+    'print 1; print -"a"; print 2;',
+    'print -nil;',
+]
+
+
+# only numeric values, i.e. these can run on the compiled fast path
+NUMERIC_PROGRAMS = [
+    'print 1 + 2 * 3 - 4 / 8;',
+    'print (1.5 + 2) * -(3 - 4); 7 * 7; print --1;',
+    ''.join(f'print {i} * 0.5 - {i + 1};' for i in range(2000)),
+]
+
+
+def parse(source: str, reporter: ErrorReporter):
+    """
+    scan and parse `source`
+    """
+    return Parser(Scanner(source, reporter).scan_tokens(), reporter).parse()
+
+
+def compile_source(source: str):
+    reporter = ErrorReporter()
+    return Compiler(reporter).compile(parse(source, reporter))
+
+
+def run(source: str, backend) -> str:
+    """
+    run `source` on `backend` (a callable taking the statements, and reporter)
+    and return its output, i.e. stdout and stderr
+    """
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+        reporter = ErrorReporter()
+        backend(parse(source, reporter), reporter)
+    return out.getvalue()
+
+
+def interpret(statements, reporter):
+    Interpreter(reporter).interpret(statements)
+
+
+def compile_and_run(statements, reporter):
+    chunk = Compiler(reporter).compile(statements)
+    VM(reporter).interpret(chunk)
+
+
+class VMTest(unittest.TestCase):
+
+    def assert_same(self, source: str):
+        self.assertEqual(run(source, interpret), run(source, compile_and_run), source)
+
+    def test_programs(self):
+        for source in PROGRAMS:
+            self.assert_same(source)
+
+    def test_many_constants(self):
+        # more constants than OP_CONSTANT can address, i.e. uses OP_CONSTANT_LONG
+        self.assert_same(''.join(f'print {i};' for i in range(70000)))
+
+    def test_shared_constants(self):
+        chunk = compile_source('print 1; print 1; print "1"; print 1;')
+        self.assertEqual(chunk.constants, [1.0, '1'])
+
+
+@unittest.skipUnless(jit.ENABLED, 'numba is not installed')
+class JITTest(unittest.TestCase):
+
+    def test_numeric_programs(self):
+        for source in NUMERIC_PROGRAMS:
+            chunk = compile_source(source)
+            self.assertTrue(chunk.numeric, source)
+            printed = jit.run(chunk)
+            self.assertIsNotNone(printed, source)
+            output = ''.join(f'{Interpreter.stringify(value)}\n' for value in printed)
+            self.assertEqual(run(source, interpret), output, source)
+
+    def test_vm_uses_fast_path(self):
+        source = NUMERIC_PROGRAMS[-1]
+        size = len(compile_source(source).code)
+        # NB: the threshold is lowered, rather than compiling a program that's MBs long
+        with mock.patch.object(jit, 'THRESHOLD', size), mock.patch.object(jit, 'run', wraps=jit.run) as jit_run:
+            self.assertEqual(run(source, interpret), run(source, compile_and_run))
+        jit_run.assert_called_once()
+
+        # shorter than the threshold, i.e. runs on the vm
+        with mock.patch.object(jit, 'THRESHOLD', size + 1), mock.patch.object(jit, 'run') as jit_run:
+            self.assertEqual(run(source, interpret), run(source, compile_and_run))
+        jit_run.assert_not_called()
+
+    def test_numba_imported_lazily(self):
+        # NB: in a new process, since numba may already be imported in this one
+        code = 'import sys, vm; print("numba" in sys.modules)'
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout, 'False\n')
+
+    def test_zero_division_falls_back(self):
+        self.assertIsNone(jit.run(compile_source('print 1; print 1 / 0;')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
 import re
 
 
+# NB: compiled once, at import, rather than looked up
+# in re's cache on every call
+_CAMEL_BOUNDARY = re.compile(r'(?<!^)(?=[A-Z])')
+
+
 def camel_to_snake(name: str) -> str:
     """
     change casing
     """
-    return re.sub(r'(?<!^)(?=[A-Z])', '_', name).lower()
+    return _CAMEL_BOUNDARY.sub('_', name).lower()
@@ -1,9 +1,9 @@
 """
 Visitor abstract class
 """
+from typing import Callable, Dict
 
-
-from utils import camel_to_snake
+from expression import NODE_CLASSES, Stmt
 
 
 class HandlerNotFoundException(Exception):
@@ -28,6 +28,20 @@ class Visitor:
      https://refactoring.guru/design-patterns/visitor/python/example
     """
 
+    # maps class of expr -> handler function, populated lazily on first visit;
+    # NB: this holds the plain (unbound) function, since it's shared by all
+    # instances of the visitor class
+    _dispatch_cache: Dict[type, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # each concrete visitor gets its own table; otherwise
+        # subclasses would share (and see) the parent's handlers
+        cls._dispatch_cache = {}
+        # NB: don't clobber a visit defined by the subclass
+        if cls.visit is Visitor.visit or getattr(cls.visit, '_generated', False):
+            cls.visit = cls._generate_visit()
+
     def visit(self, expr: 'Expr'):
         """
         this will determine which specific handler to invoke; dispatch
@@ -39,13 +53,62 @@ class Visitor:
         More broadly, I'll use python dynamism, unless some substantial
         gain in readability or expressability is needed
         """
-        suffix = camel_to_snake(expr.__class__.__name__)
-        # determine the name of the handler method from class of expr
-        # NB: this requires the class and handler have the
-        # same name in PascalCase and snake_case, respectively
-        handler = f'visit_{suffix}'
-        if hasattr(self, handler):
-            return getattr(self, handler)(expr)
-        else:
-            print(f"Visitor does not have {handler}")
-            raise HandlerNotFoundException()
+        try:
+            handler = self._dispatch_cache[type(expr)]
+        except KeyError:
+            handler = self._resolve(type(expr))
+        return handler(self, expr)
+
+    @classmethod
+    def _resolve(cls, expr_type: type) -> Callable:
+        """
+        resolve and cache the handler for `expr_type`
+        """
+        # the name of the handler method is determined from class of expr;
+        # NB: only Node classes have one, e.g. not a None left in the parser's output
+        handler_name = getattr(expr_type, '_visit_name', None)
+        if handler_name is None:
+            raise HandlerNotFoundException(f"Visitor does not have a handler for {expr_type.__name__}")
+        handler = getattr(cls, handler_name, None)
+        if handler is None:
+            raise HandlerNotFoundException(f"Visitor does not have {handler_name}")
+        cls._dispatch_cache[expr_type] = handler
+        return handler
+
+    @classmethod
+    def _generate_visit(cls) -> Callable:
+        """
+        generate a visit method specialized to this class's handlers, i.e.
+
+            def visit(self, expr):
+                expr_type = type(expr)
+                if expr_type is Binary:
+                    return visit_binary(self, expr)
+                ...
+                return generic_visit(self, expr)
+
+        so dispatch is a few identity checks and a direct call. Node classes
+        without a handler, or defined after this class, fall through to the
+        generic (cached) dispatch, i.e. Visitor.visit
+        """
+        namespace = {'generic_visit': Visitor.visit}
+        lines = ['def visit(self, expr):',
+                 '    expr_type = type(expr)']
+        # test for expressions first, since there are many more of them than statements
+        node_classes = sorted(NODE_CLASSES.items(), key=lambda item: issubclass(item[1], Stmt))
+        for handler_name, node_class in node_classes:
+            handler = getattr(cls, handler_name, None)
+            if handler is None:
+                continue
+            namespace[node_class.__name__] = node_class
+            namespace[handler_name] = handler
+            lines.append(f'    if expr_type is {node_class.__name__}:')
+            lines.append(f'        return {handler_name}(self, expr)')
+        lines.append('    return generic_visit(self, expr)')
+
+        exec('\n'.join(lines), namespace)
+        visit = namespace['visit']
+        visit.__doc__ = Visitor.visit.__doc__
+        visit.__qualname__ = f'{cls.__qualname__}.visit'
+        visit._generated = True
+        return visit
@@ -0,0 +1,95 @@
+"""
+Virtual machine for executing bytecode
+"""
+from bytecode import (Chunk, OP_ADD, OP_CONSTANT, OP_CONSTANT_LONG, OP_COUNT, OP_DIVIDE, OP_EQUAL, OP_FALSE, OP_GREATER,
+                      OP_GREATER_EQUAL, OP_LESS, OP_LESS_EQUAL, OP_MULTIPLY, OP_NEGATE, OP_NIL, OP_NOT, OP_NOT_EQUAL,
+                      OP_POP, OP_PRINT, OP_RETURN, OP_SUBTRACT, OP_TRUE)
+from interpreter import BIN_OPS, InterpretationError, Interpreter, LoxRuntimeError
+import jit
+from loxtoken import TokenType
+
+# maps opcode -> handler, for binary ops; NB: a list, indexed by opcode,
+# with None for non-binary ops. The handlers are shared with the tree-walking
+# Interpreter, so both have the same semantics
+_BINARY_OPS = [None] * OP_COUNT
+_BINARY_OPS[OP_NOT_EQUAL] = BIN_OPS[TokenType.BANG_EQUAL]
+_BINARY_OPS[OP_EQUAL] = BIN_OPS[TokenType.EQUAL_EQUAL]
+_BINARY_OPS[OP_GREATER] = BIN_OPS[TokenType.GREATER]
+_BINARY_OPS[OP_GREATER_EQUAL] = BIN_OPS[TokenType.GREATER_EQUAL]
+_BINARY_OPS[OP_LESS] = BIN_OPS[TokenType.LESS]
+_BINARY_OPS[OP_LESS_EQUAL] = BIN_OPS[TokenType.LESS_EQUAL]
+_BINARY_OPS[OP_SUBTRACT] = BIN_OPS[TokenType.MINUS]
+_BINARY_OPS[OP_ADD] = BIN_OPS[TokenType.PLUS]
+_BINARY_OPS[OP_DIVIDE] = BIN_OPS[TokenType.SLASH]
+_BINARY_OPS[OP_MULTIPLY] = BIN_OPS[TokenType.STAR]
+
+
+class VM:
+    """
+    Stack-based vm for executing a chunk of bytecode (see compiler.py)
+
+    Unlike the tree-walking Interpreter, which takes several python
+    frames per AST node, this runs the whole chunk in a single loop
+    """
+    def __init__(self, error_reporter: 'ErrorReporter'):
+        self.error_reporter = error_reporter
+
+    def interpret(self, chunk: Chunk):
+        try:
+            self.run(chunk)
+        except LoxRuntimeError as e:
+            self.error_reporter.runtime_error(e)
+
+    def run(self, chunk: Chunk):
+        """
+        dispatch loop
+        """
+        # NB: numba is only imported by jit.run, i.e. once a chunk is past the threshold
+        if chunk.numeric and jit.ENABLED and len(chunk.code) >= jit.THRESHOLD:
+            printed = jit.run(chunk)
+            if printed is not None:
+                for value in printed:
+                    print(Interpreter.stringify(value))
+                return
+
+        # NB: bind everything used by the loop to locals
+        code = chunk.code
+        constants = chunk.constants
+        tokens = chunk.tokens
+        binary_ops = _BINARY_OPS
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        ip = 0  # points to next instruction
+
+        while True:
+            instruction = code[ip]
+            ip += 1
+            # NB: branches are ordered by (expected) frequency
+            if instruction == OP_CONSTANT:
+                push(constants[code[ip] << 8 | code[ip + 1]])
+                ip += 2
+            elif instruction == OP_CONSTANT_LONG:
+                push(constants[code[ip] << 16 | code[ip + 1] << 8 | code[ip + 2]])
+                ip += 3
+            elif binary_ops[instruction] is not None:
+                right = pop()
+                stack[-1] = binary_ops[instruction](stack[-1], right)
+            elif instruction == OP_NEGATE:
+                stack[-1] = Interpreter.negate(tokens[ip - 1], stack[-1])
+            elif instruction == OP_NOT:
+                stack[-1] = not Interpreter.is_truthy(stack[-1])
+            elif instruction == OP_NIL:
+                push(None)
+            elif instruction == OP_TRUE:
+                push(True)
+            elif instruction == OP_FALSE:
+                push(False)
+            elif instruction == OP_PRINT:
+                print(Interpreter.stringify(pop()))
+            elif instruction == OP_POP:
+                pop()
+            elif instruction == OP_RETURN:
+                return
+            else:
+                raise InterpretationError(f"unknown opcode {instruction}")